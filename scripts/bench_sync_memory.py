@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Sync Memory Benchmark
+=====================
+
+Measures peak RSS of a deals sync of N synthetic records. HubSpot pages and
+Supabase responses are generated in-process, so nothing leaves the machine and
+the run exercises only the sync's own fetch -> transform -> write pipeline.
+
+Requirements:
+- the hubspot_sync.py requirements (supabase-py, requests, python-dotenv, tqdm)
+
+Usage:
+python bench_sync_memory.py --records 1000000
+"""
+
+import os
+import time
+import json
+import argparse
+import asyncio
+import resource
+
+os.environ.setdefault("NEXT_PUBLIC_SUPABASE_URL", "http://supabase.invalid")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark")
+os.environ.setdefault("HUBSPOT_API_KEY", "benchmark")
+
+import hubspot_sync
+
+class _Response:
+    def __init__(self, payload):
+        self.status_code = 200
+        self.content = json.dumps(payload).encode("utf-8")
+        self.headers = {}
+        self.text = ""
+
+def _deal(number: int) -> dict:
+    return {
+        "id": str(10 ** 9 + number),
+        "properties": {
+            "dealname": f"Deal {number}",
+            "dealstage": "closedwon" if number % 3 else "appointmentscheduled",
+            "amount": str(1000 + number % 5000),
+            "closedate": "1700000000000",
+            "createdate": "1690000000000",
+            "pipeline": "default",
+            "dealtype": "newbusiness",
+            "description": "Renewal of the annual platform subscription " * 4,
+            "hubspot_owner_id": str(100 + number % 40),
+        },
+        "createdAt": "2024-01-01T00:00:00Z",
+        "updatedAt": "2024-01-01T00:00:00Z",
+        "archived": False,
+    }
+
+def build_sync(records: int) -> hubspot_sync.HubSpotToSupabaseSync:
+    hubspot_sync.create_client = lambda url, key: None
+    sync = hubspot_sync.HubSpotToSupabaseSync(dedupe="off")
+    sync.request_delay = 0
+
+    def hubspot_request(method, url, params=None, **kwargs):
+        after = int((params or {}).get("after", 0))
+        size = int((params or {}).get("limit", 100))
+        size = min(size, records - after)
+        paging = {"next": {"after": str(after + size)}} if after + size < records else {}
+        return _Response({"results": [_deal(after + i) for i in range(size)], "paging": paging})
+
+    def supabase_post(url, params=None, headers=None, data=None):
+        if not (params or {}).get("select"):
+            return _Response(0)  # rpc/refresh_company_stats
+        rows = json.loads(data)
+        return _Response([
+            {"id": number, "hubspot_deal_id": row["hubspot_deal_id"], "company_id": None}
+            for number, row in enumerate(rows if isinstance(rows, list) else [rows])
+        ])
+
+    sync.http.request = hubspot_request
+    sync.http.post = supabase_post
+    return sync
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS of a synthetic deals sync")
+    parser.add_argument("--records", type=int, default=100000, help="Synthetic deals to sync")
+    args = parser.parse_args()
+
+    sync = build_sync(args.records)
+    baseline_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    started = time.time()
+    asyncio.run(sync.sync_deals(0))
+    elapsed = time.time() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"\n📏 {args.records:,} deals")
+    print(f"   peak RSS {peak_mb:,.0f} MB (after imports {baseline_mb:,.0f} MB), {elapsed:.1f}s")
+    print(f"   ID map {len(sync.hubspot_to_supabase_ids['deals']):,} entries, {len(sync.stats.errors)} errors")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Embedding Queue Stats
+=====================
+
+Reads the trigger-maintained embedding queue counters and corrects drift
+(see supabase/migrations/20261019_embedding_queue_counters.sql).
+
+Requirements:
+- supabase-py
+- python-dotenv
+
+Usage:
+python embedding_queue_stats.py stats              # Counts per status (constant time)
+python embedding_queue_stats.py stats --watch 5    # Refresh every 5 seconds
+python embedding_queue_stats.py reconcile          # Recount the queue and fix the counters
+"""
+
+import os
+import sys
+import time
+import argparse
+from typing import Dict, List, Any
+
+from supabase import create_client, Client
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STATUSES = ("pending", "processing", "completed", "failed")
+
+def get_client() -> Client:
+    url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
+    key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    if not url or not key:
+        print("❌ Missing environment variables: NEXT_PUBLIC_SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY")
+        sys.exit(1)
+    return create_client(url, key)
+
+def fetch_stats(supabase: Client) -> Dict[str, int]:
+    """Counts per status from the counters table"""
+    rows = supabase.rpc("get_embedding_queue_stats_fast").execute().data or [{}]
+    return {status: int(rows[0].get(status) or 0) for status in STATUSES}
+
+def reconcile(supabase: Client) -> List[Dict[str, Any]]:
+    """Recount embedding_queue and fold any drift back into the counters"""
+    return supabase.rpc("reconcile_embedding_queue_counters").execute().data or []
+
+def print_stats(stats: Dict[str, int], elapsed_ms: float):
+    total = sum(stats.values())
+    print(f"\n📊 Embedding queue ({elapsed_ms:.0f}ms)")
+    for status in STATUSES:
+        print(f"   {status:<11} {stats[status]:>12,}")
+    print(f"   {'total':<11} {total:>12,}")
+
+def print_reconcile(rows: List[Dict[str, Any]], elapsed_ms: float):
+    drifted = [row for row in rows if row["drift"]]
+    print(f"\n🔧 Reconciled embedding queue counters ({elapsed_ms:.0f}ms)")
+    print(f"   {'status':<11} {'counted':>12} {'tracked':>12} {'drift':>8}")
+    for row in rows:
+        print(f"   {row['status']:<11} {row['counted']:>12,} {row['tracked']:>12,} {row['drift']:>+8,}")
+    if drifted:
+        print(f"⚠️  Corrected drift on {len(drifted)} status(es)")
+    else:
+        print("✅ Counters were already exact")
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding queue stats and counter reconciliation")
+    subcommands = parser.add_subparsers(dest="command")
+
+    stats_parser = subcommands.add_parser("stats", help="Show counts per status")
+    stats_parser.add_argument("--watch", type=float, default=None, metavar="SECONDS",
+                              help="Keep refreshing every SECONDS")
+    subcommands.add_parser("reconcile", help="Recount the queue and correct the counters")
+
+    args = parser.parse_args()
+    supabase = get_client()
+
+    if args.command == "reconcile":
+        started = time.time()
+        rows = reconcile(supabase)
+        print_reconcile(rows, (time.time() - started) * 1000)
+        return
+
+    while True:
+        started = time.time()
+        stats = fetch_stats(supabase)
+        print_stats(stats, (time.time() - started) * 1000)
+        if not getattr(args, "watch", None):
+            break
+        try:
+            time.sleep(args.watch)
+        except KeyboardInterrupt:
+            break
+
+if __name__ == "__main__":
+    main()
@@ -7,33 +7,164 @@ and providing detailed information about what's happening during the sync proces
 
 Usage:
     python scripts/test_hubspot_debug.py
+    python scripts/test_hubspot_debug.py --runs 3 --fail-on-regression   # record timings, flag slow steps
+    python scripts/test_hubspot_debug.py --runs 3 --live --limit 2       # time the real sync steps too
+    python scripts/test_hubspot_debug.py --list-runs
+    python scripts/test_hubspot_debug.py --diff -2 -1                    # compare two recorded runs
+    python scripts/test_hubspot_debug.py --load-test --concurrency 1,5,20 --requests 200 \
+        --mix state:1,debug:2,test:api_connection:1 --output load_results.json
 """
 
+import argparse
+import asyncio
+import os
+import statistics
+import random
 import requests
 import json
 import sys
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
 
 # Configuration
 BASE_URL = "http://localhost:3000"  # Change this to your app URL
 API_KEY = None  # Add your API key if using authentication
+HISTORY_FILE = "hubspot_debug_timings.jsonl"
+
+class TimingHistory:
+    """
+    Per-step timing history for debug endpoint runs, kept as JSON lines on disk.
+    
+    The debug route reports `duration` as milliseconds since the request started,
+    so each step's own time is the difference from the previous step. Baselines are
+    the median of the last `window` successful runs with the same sync type, limit and
+    dry-run mode (dry runs skip the sync steps, so they are never compared with live runs).
+    """
+    
+    def __init__(self, path: str = HISTORY_FILE, window: int = 10, threshold: float = 0.25, min_delta_ms: float = 50):
+        self.path = path
+        self.window = window
+        self.threshold = threshold
+        self.min_delta_ms = min_delta_ms
+    
+    @staticmethod
+    def step_timings(steps: list) -> Dict[str, float]:
+        """Turn cumulative step durations into per-step milliseconds (repeated names get #2, #3...)"""
+        timings = {}
+        seen: Dict[str, int] = {}
+        previous = 0
+        for step in steps:
+            if 'duration' not in step:
+                continue
+            seen[step['step']] = seen.get(step['step'], 0) + 1
+            name = step['step'] if seen[step['step']] == 1 else f"{step['step']}#{seen[step['step']]}"
+            timings[name] = max(0, step['duration'] - previous)
+            previous = step['duration']
+        return timings
+    
+    def load(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+    
+    def baselines(self, sync_type: str, limit: int, dry_run: bool) -> Dict[str, float]:
+        """Median per-step time over the last `window` matching successful runs"""
+        # Failed runs often stop early, and their short steps would drag the baseline down
+        runs = [
+            r for r in self.load()
+            if r['success'] and r['sync_type'] == sync_type and r['limit'] == limit and r['dry_run'] == dry_run
+        ][-self.window:]
+        samples: Dict[str, List[float]] = {}
+        for run in runs:
+            for name, ms in run['steps'].items():
+                samples.setdefault(name, []).append(ms)
+        return {name: statistics.median(values) for name, values in samples.items()}
+    
+    def regressions(self, timings: Dict[str, float], baselines: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+        """Steps slower than baseline by more than the threshold (and the absolute floor)"""
+        flagged = {}
+        for name, ms in timings.items():
+            baseline = baselines.get(name)
+            if baseline is None:
+                continue
+            if ms - baseline > self.min_delta_ms and ms > baseline * (1 + self.threshold):
+                flagged[name] = {"ms": ms, "baseline_ms": baseline, "change": (ms - baseline) / baseline if baseline else float("inf")}
+        return flagged
+    
+    def record(self, sync_type: str, limit: int, dry_run: bool, success: bool, steps: list, total_ms: float) -> Dict[str, Any]:
+        run = {
+            "run_id": datetime.now().strftime("%Y%m%dT%H%M%S%f"),
+            "timestamp": datetime.now().isoformat(),
+            "sync_type": sync_type,
+            "limit": limit,
+            "dry_run": dry_run,
+            "success": success,
+            "total_ms": total_ms,
+            "steps": self.step_timings(steps)
+        }
+        with open(self.path, "a") as f:
+            f.write(json.dumps(run) + "\n")
+        return run
+    
+    def find(self, ref: str) -> Dict[str, Any]:
+        """Look up a run by run_id or by index (-1 = latest)"""
+        runs = self.load()
+        try:
+            return runs[int(ref)]
+        except (ValueError, IndexError):
+            for run in runs:
+                if run['run_id'] == ref:
+                    return run
+        raise KeyError(f"No recorded run {ref}")
+    
+    def print_runs(self):
+        runs = self.load()
+        print(f"\n🗂️  {len(runs)} recorded runs in {self.path}")
+        for index, run in enumerate(runs):
+            print(f"   [{index - len(runs)}] {run['run_id']}  {run['sync_type']} limit={run['limit']} "
+                  f"dry_run={run['dry_run']}  total {run['total_ms']}ms  {'✅' if run['success'] else '❌'}")
+    
+    def print_diff(self, ref_a: str, ref_b: str):
+        a, b = self.find(ref_a), self.find(ref_b)
+        print("\n" + "="*80)
+        print(f"STEP TIMING DIFF  {a['run_id']} ({a['sync_type']}/{a['limit']})  ->  {b['run_id']} ({b['sync_type']}/{b['limit']})")
+        print("="*80)
+        print(f"{'step':<32}{'A ms':>10}{'B ms':>10}{'delta':>10}{'change':>10}")
+        for name in list(a['steps']) + [n for n in b['steps'] if n not in a['steps']]:
+            ms_a, ms_b = a['steps'].get(name), b['steps'].get(name)
+            if ms_a is None or ms_b is None:
+                print(f"{name:<32}{ms_a if ms_a is not None else '-':>10}{ms_b if ms_b is not None else '-':>10}")
+                continue
+            change = f"{(ms_b - ms_a) / ms_a:+.0%}" if ms_a else "n/a"
+            flag = "  ⚠️" if ms_b - ms_a > self.min_delta_ms and ms_b > ms_a * (1 + self.threshold) else ""
+            print(f"{name:<32}{ms_a:>10.0f}{ms_b:>10.0f}{ms_b - ms_a:>+10.0f}{change:>10}{flag}")
+        print(f"{'TOTAL':<32}{a['total_ms']:>10.0f}{b['total_ms']:>10.0f}{b['total_ms'] - a['total_ms']:>+10.0f}")
 
 class HubSpotDebugger:
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, history: Optional[TimingHistory] = None):
         self.base_url = base_url
         self.session = requests.Session()
+        self.history = history
+        self.regressions_found: Dict[str, Dict[str, float]] = {}
         
         # Add authentication headers if needed
         if API_KEY:
             self.session.headers.update({"Authorization": f"Bearer {API_KEY}"})
     
-    def print_step_results(self, steps: list):
+    def print_step_results(self, steps: list, baselines: Optional[Dict[str, float]] = None,
+                           regressions: Optional[Dict[str, Dict[str, float]]] = None):
         """Pretty print debug steps"""
         print("\n" + "="*80)
         print("DEBUG STEPS BREAKDOWN")
         print("="*80)
         
+        timings = TimingHistory.step_timings(steps)
+        names = list(timings)
+        timed = 0
+        
         for step in steps:
             status_emoji = {
                 'success': '✅',
@@ -45,7 +176,15 @@ class HubSpotDebugger:
             print(f"\n{status_emoji} [{step['step']}] {step['message']}")
             print(f"   Timestamp: {step['timestamp']}")
             if 'duration' in step:
-                print(f"   Duration: {step['duration']}ms")
+                name = names[timed]
+                timed += 1
+                line = f"   Duration: {step['duration']}ms (step {timings[name]}ms"
+                if baselines and name in baselines:
+                    line += f", baseline {baselines[name]:.0f}ms"
+                line += ")"
+                if regressions and name in regressions:
+                    line += f"  ⚠️ REGRESSION {regressions[name]['change']:+.0%}"
+                print(line)
             
             if step.get('data'):
                 print(f"   Data: {json.dumps(step['data'], indent=4)}")
@@ -68,9 +207,12 @@ class HubSpotDebugger:
             
             data = response.json()
             
+            steps = data.get('debugSteps', [])
+            baselines, regressions = self._track_timings(sync_type, limit, dry_run, data)
+            
             if data.get('success'):
                 print("✅ Debug endpoint successful!")
-                self.print_step_results(data.get('debugSteps', []))
+                self.print_step_results(steps, baselines, regressions)
                 
                 summary = data.get('summary', {})
                 print(f"\n📊 SUMMARY:")
@@ -85,7 +227,12 @@ class HubSpotDebugger:
                 print(f"Error: {data.get('error', 'Unknown error')}")
                 
                 if 'debugSteps' in data:
-                    self.print_step_results(data['debugSteps'])
+                    self.print_step_results(steps, baselines, regressions)
+            
+            if regressions:
+                print(f"\n⚠️  {len(regressions)} step(s) slower than baseline:")
+                for name, info in regressions.items():
+                    print(f"   - {name}: {info['ms']:.0f}ms vs {info['baseline_ms']:.0f}ms ({info['change']:+.0%})")
                     
         except requests.exceptions.RequestException as e:
             print(f"❌ Request failed: {e}")
@@ -97,6 +244,21 @@ class HubSpotDebugger:
         
         return True
     
+    def _track_timings(self, sync_type: str, limit: int, dry_run: bool, data: Dict[str, Any]):
+        """Compare this run's step times with the stored baseline, then record it"""
+        if not self.history:
+            return None, None
+        
+        steps = data.get('debugSteps', [])
+        baselines = self.history.baselines(sync_type, limit, dry_run)
+        regressions = self.history.regressions(TimingHistory.step_timings(steps), baselines)
+        self.history.record(
+            sync_type, limit, dry_run, bool(data.get('success')), steps,
+            data.get('summary', {}).get('totalDuration', steps[-1].get('duration', 0) if steps else 0)
+        )
+        self.regressions_found.update(regressions)
+        return baselines, regressions
+    
     def test_individual_tests(self):
         """Test individual test endpoints"""
         print(f"\n🧪 Running individual tests...")
@@ -174,12 +336,262 @@ class HubSpotDebugger:
         except Exception as e:
             print(f"❌ Get state error: {e}")
 
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+class LoadTester:
+    """
+    Non-interactive load test for the HubSpot debug/test routes.
+    
+    Requests are drawn from a weighted mix and fired by `concurrency` asyncio workers
+    sharing one pooled requests.Session (calls run in a thread pool sized to match).
+    Debug syncs always run with dryRun. The parse_data and database_insert tests run
+    real syncs that write to the database, so the mix only accepts them with
+    allow_writes.
+    
+    Mix entries:
+        state              GET  /api/hubspot/debug
+        debug              POST /api/hubspot/debug  (dry run)
+        test:<testType>    POST /api/hubspot/test
+    """
+    
+    WRITING_TESTS = {"parse_data", "database_insert"}
+    
+    def __init__(self, base_url: str, sync_type: str = "companies", limit: int = 3, timeout: float = 60):
+        self.base_url = base_url
+        self.sync_type = sync_type
+        self.limit = limit
+        self.timeout = timeout
+    
+    @classmethod
+    def parse_mix(cls, mix: str, allow_writes: bool = False) -> List[Tuple[str, int]]:
+        """Parse "state:1,debug:2,test:api_connection:1" into [(kind, weight), ...]"""
+        entries = []
+        for item in mix.split(","):
+            kind, _, weight = item.strip().rpartition(":")
+            if not kind or not weight.isdigit():
+                kind, weight = item.strip(), "1"
+            entries.append((kind, int(weight)))
+        
+        writing = [kind for kind, _ in entries if kind.startswith("test:") and kind.split(":", 1)[1] in cls.WRITING_TESTS]
+        if writing and not allow_writes:
+            raise ValueError(f"{', '.join(writing)} would write to the database; pass --allow-writes to include writing tests")
+        return entries
+    
+    def _build_request(self, kind: str) -> Tuple[str, str, Dict]:
+        if kind == "state":
+            return "GET", f"{self.base_url}/api/hubspot/debug", None
+        if kind == "debug":
+            return "POST", f"{self.base_url}/api/hubspot/debug", {
+                "testConnection": True,
+                "syncType": self.sync_type,
+                "limit": self.limit,
+                "dryRun": True
+            }
+        if kind.startswith("test:"):
+            return "POST", f"{self.base_url}/api/hubspot/test", {
+                "testType": kind.split(":", 1)[1],
+                "objectType": self.sync_type,
+                "limit": self.limit
+            }
+        raise ValueError(f"Unknown request kind: {kind}")
+    
+    def _send(self, session: requests.Session, kind: str) -> Dict[str, Any]:
+        method, url, payload = self._build_request(kind)
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, json=payload, timeout=self.timeout)
+            ok = response.status_code < 400
+            try:
+                ok = ok and response.json().get('success', True)
+            except ValueError:
+                ok = False
+            status = response.status_code
+            error = None if ok else (response.text[:200] or f"HTTP {status}")
+        except requests.exceptions.RequestException as e:
+            ok, status, error = False, None, str(e)
+        return {
+            "kind": kind,
+            "ok": ok,
+            "status": status,
+            "latency_ms": (time.perf_counter() - started) * 1000,
+            "error": error
+        }
+    
+    async def run_level(self, concurrency: int, total_requests: int, mix: List[Tuple[str, int]]) -> Dict[str, Any]:
+        """Fire `total_requests` requests from the mix with `concurrency` in flight"""
+        kinds = [kind for kind, _ in mix]
+        weights = [weight for _, weight in mix]
+        plan = random.choices(kinds, weights=weights, k=total_requests)
+        
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if API_KEY:
+            session.headers.update({"Authorization": f"Bearer {API_KEY}"})
+        
+        loop = asyncio.get_event_loop()
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        queue: asyncio.Queue = asyncio.Queue()
+        for kind in plan:
+            queue.put_nowait(kind)
+        results: List[Dict[str, Any]] = []
+        
+        async def worker():
+            while not queue.empty():
+                kind = queue.get_nowait()
+                results.append(await loop.run_in_executor(executor, self._send, session, kind))
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        executor.shutdown()
+        session.close()
+        
+        return self.summarize(concurrency, results, elapsed)
+    
+    @staticmethod
+    def summarize(concurrency: int, results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+        def stats_for(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+            latencies = sorted(r["latency_ms"] for r in items)
+            errors = sum(1 for r in items if not r["ok"])
+            return {
+                "requests": len(items),
+                "errors": errors,
+                "error_rate": errors / len(items) if items else 0.0,
+                "p50_ms": percentile(latencies, 50),
+                "p95_ms": percentile(latencies, 95),
+                "p99_ms": percentile(latencies, 99),
+                "max_ms": latencies[-1] if latencies else 0.0
+            }
+        
+        summary = stats_for(results)
+        summary.update({
+            "concurrency": concurrency,
+            "duration_s": elapsed,
+            "throughput_rps": len(results) / elapsed if elapsed else 0.0,
+            "by_kind": {
+                kind: stats_for([r for r in results if r["kind"] == kind])
+                for kind in sorted({r["kind"] for r in results})
+            },
+            "sample_errors": [r["error"] for r in results if r["error"]][:5]
+        })
+        return summary
+    
+    def print_level(self, summary: Dict[str, Any]):
+        status_emoji = '✅' if summary['error_rate'] == 0 else ('⚠️' if summary['error_rate'] < 0.05 else '❌')
+        print(f"\n{status_emoji} Concurrency {summary['concurrency']}: "
+              f"{summary['requests']} requests in {summary['duration_s']:.1f}s "
+              f"({summary['throughput_rps']:.1f} req/s), errors {summary['error_rate']:.1%}")
+        print(f"   Latency p50 {summary['p50_ms']:.0f}ms | p95 {summary['p95_ms']:.0f}ms | "
+              f"p99 {summary['p99_ms']:.0f}ms | max {summary['max_ms']:.0f}ms")
+        for kind, stats in summary['by_kind'].items():
+            print(f"   - {kind}: {stats['requests']} req, p95 {stats['p95_ms']:.0f}ms, "
+                  f"errors {stats['error_rate']:.1%}")
+        for error in summary['sample_errors']:
+            print(f"   ! {error}")
+
+async def run_load_test(args) -> Dict[str, Any]:
+    """Run every requested concurrency level and optionally export the results as JSON"""
+    tester = LoadTester(args.base_url, sync_type=args.sync_type, limit=args.limit, timeout=args.timeout)
+    mix = LoadTester.parse_mix(args.mix, allow_writes=args.allow_writes)
+    levels = [int(level) for level in args.concurrency.split(",")]
+    
+    print("🔥 HubSpot Debug Load Test")
+    print("="*50)
+    print(f"   Target: {args.base_url}")
+    print(f"   Mix: {', '.join(f'{kind}×{weight}' for kind, weight in mix)}")
+    print(f"   Levels: {levels} ({args.requests} requests each)")
+    if any(kind.split(":", 1)[-1] in LoadTester.WRITING_TESTS for kind, _ in mix if kind.startswith("test:")):
+        print("   ⚠️  The mix includes tests that write HubSpot records to the database")
+    
+    report = {
+        "base_url": args.base_url,
+        "started_at": datetime.now().isoformat(),
+        "mix": dict(mix),
+        "levels": []
+    }
+    
+    for concurrency in levels:
+        summary = await tester.run_level(concurrency, args.requests, mix)
+        tester.print_level(summary)
+        report["levels"].append(summary)
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+    
+    return report
+
 def main():
     """Main debugging workflow"""
+    parser = argparse.ArgumentParser(description="HubSpot sync debugger")
+    parser.add_argument("--base-url", default=BASE_URL, help="App URL")
+    parser.add_argument("--load-test", action="store_true", help="Run a non-interactive load test")
+    parser.add_argument("--concurrency", default="1,5,10", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per concurrency level")
+    parser.add_argument("--mix", default="state:1,debug:1,test:api_connection:1",
+                        help="Weighted request mix, e.g. state:1,debug:2,test:fetch_raw_data:1")
+    parser.add_argument("--sync-type", default="companies", help="Object type for debug/test requests")
+    parser.add_argument("--limit", type=int, default=3, help="Record limit for debug/test requests")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument("--output", default=None, help="Write load test results to this JSON file")
+    parser.add_argument("--allow-writes", action="store_true",
+                        help="Allow test:parse_data and test:database_insert, which write to the database")
+    
+    # Step timing history
+    parser.add_argument("--history-file", default=HISTORY_FILE, help="Where per-step timings are kept")
+    parser.add_argument("--baseline-window", type=int, default=10, help="Runs in the rolling baseline")
+    parser.add_argument("--regression-threshold", type=float, default=0.25,
+                        help="Flag steps slower than baseline by this fraction")
+    parser.add_argument("--runs", type=int, default=None,
+                        help="Non-interactive: run the debug sync N times and record timings (dry run unless --live)")
+    parser.add_argument("--live", action="store_true",
+                        help="With --runs, run the real sync steps (writes up to --limit records per run)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if any step regressed")
+    parser.add_argument("--list-runs", action="store_true", help="List recorded runs")
+    parser.add_argument("--diff", nargs=2, metavar=("RUN_A", "RUN_B"),
+                        help="Compare two recorded runs (run_id or index, e.g. -2 -1)")
+    args = parser.parse_args()
+    
+    history = TimingHistory(args.history_file, window=args.baseline_window, threshold=args.regression_threshold)
+    
+    if args.load_test:
+        try:
+            LoadTester.parse_mix(args.mix, allow_writes=args.allow_writes)
+        except ValueError as e:
+            parser.error(str(e))
+        asyncio.run(run_load_test(args))
+        return
+    
+    if args.list_runs:
+        history.print_runs()
+        return
+    
+    if args.diff:
+        history.print_diff(*args.diff)
+        return
+    
+    if args.runs:
+        debugger = HubSpotDebugger(args.base_url, history)
+        if args.live:
+            print(f"⚠️  Live runs sync up to {args.limit} {args.sync_type} into the database each time")
+        for _ in range(args.runs):
+            debugger.test_debug_endpoint(sync_type=args.sync_type, limit=args.limit, dry_run=not args.live)
+        if args.fail_on_regression and debugger.regressions_found:
+            sys.exit(1)
+        return
+    
     print("🚀 HubSpot Sync Debugger")
     print("="*50)
     
-    debugger = HubSpotDebugger(BASE_URL)
+    debugger = HubSpotDebugger(args.base_url, history)
     
     # Step 1: Get current state
     debugger.get_current_state()
@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+
+@pytest.fixture
+def hubspot_sync(monkeypatch, tmp_path):
+    """The sync module, importable without credentials or network access."""
+    for module in ("supabase", "dotenv", "tqdm", "requests"):
+        pytest.importorskip(module)
+
+    monkeypatch.chdir(tmp_path)  # hubspot_sync.log is written to the working directory
+    monkeypatch.setenv("NEXT_PUBLIC_SUPABASE_URL", "http://supabase.test")
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "service-role-key")
+    monkeypatch.setenv("HUBSPOT_API_KEY", "hubspot-key")
+
+    import hubspot_sync as module
+    monkeypatch.setattr(module, "create_client", lambda url, key, options=None: None)
+    return module
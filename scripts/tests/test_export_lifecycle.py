@@ -0,0 +1,118 @@
+"""CRM export bulk-load path (--bulk-export) against a stubbed HubSpot API."""
+
+import asyncio
+import io
+import os
+import zipfile
+
+EXPORT_CSV = (
+    "Record ID,Deal Name,Deal Stage,Amount,Close Date,Deal owner\n"
+    "101,Big renewal,Closed Won,\"12,500.00\",2024-03-15,Ada Lovelace\n"
+    "102,New logo,appointmentscheduled,800,2024-04-01 09:30,\n"
+)
+
+PROPERTIES = [
+    {"name": "dealname", "label": "Deal Name", "type": "string"},
+    {"name": "dealstage", "label": "Deal Stage", "type": "enumeration", "options": [
+        {"label": "Appointment Scheduled", "value": "appointmentscheduled"},
+        {"label": "Closed Won", "value": "closed-won"},
+    ]},
+    {"name": "amount", "label": "Amount", "type": "number"},
+    {"name": "closedate", "label": "Close Date", "type": "datetime"},
+    {"name": "hubspot_owner_id", "label": "Deal owner", "type": "enumeration", "options": []},
+]
+
+
+class DownloadResponse:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+
+def _zipped(csv_text: str) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        archive.writestr("deals.csv", csv_text)
+    return buf.getvalue()
+
+
+def _make_sync(hubspot_sync, monkeypatch, calls):
+    sync = hubspot_sync.HubSpotToSupabaseSync(use_exports=True, dedupe="off")
+    sync.export_poll_interval = 0
+    statuses = iter(["PENDING", "PROCESSING", "COMPLETE"])
+
+    async def fake_request(endpoint, params=None, method="GET", json_body=None):
+        calls.append((method, endpoint, json_body))
+        if endpoint == "/crm/v3/exports/export/async":
+            return {"id": 42}
+        if endpoint == "/crm/v3/exports/export/async/tasks/42/status":
+            status = next(statuses)
+            return {"status": status, "result": "https://export.test/deals.zip"} if status == "COMPLETE" else {"status": status}
+        if endpoint == "/crm/v3/properties/deals":
+            return {"results": PROPERTIES}
+        raise AssertionError(f"unexpected HubSpot call {method} {endpoint}")
+
+    monkeypatch.setattr(sync, "_make_hubspot_request", fake_request)
+    monkeypatch.setattr(sync.http, "get", lambda url, stream=False: DownloadResponse(_zipped(EXPORT_CSV)))
+    return sync
+
+
+def _collect(sync, object_type):
+    async def run():
+        return [page async for page in sync._iter_export_pages(object_type)]
+    return asyncio.run(run())
+
+
+def test_export_lifecycle_yields_api_shaped_records(hubspot_sync, monkeypatch):
+    calls = []
+    sync = _make_sync(hubspot_sync, monkeypatch, calls)
+    downloaded = []
+    download = sync._download_export
+    monkeypatch.setattr(sync, "_download_export", lambda url: downloaded.append(download(url)) or downloaded[-1])
+
+    pages = _collect(sync, "deals")
+
+    start = calls[0]
+    assert start[0] == "POST" and start[2]["objectType"] == "DEAL"
+    assert start[2]["exportInternalValuesOptions"] == ["NAMES", "VALUES"]
+    assert sum(1 for call in calls if call[1].endswith("/status")) == 3
+
+    records = [record for page in pages for record in page]
+    assert [record["id"] for record in records] == ["101", "102"]
+    first, second = (record["properties"] for record in records)
+    assert first["dealstage"] == "closed-won"
+    assert first["closedate"] == "1710460800000"
+    assert second["dealstage"] == "appointmentscheduled"
+    assert second["closedate"] == "1711963800000"
+    assert second["hubspot_owner_id"] is None
+
+    # The downloaded file is removed once it has been read
+    assert downloaded and not os.path.exists(downloaded[0])
+
+
+def test_export_records_transform_like_paged_records(hubspot_sync, monkeypatch):
+    sync = _make_sync(hubspot_sync, monkeypatch, [])
+    exported = _collect(sync, "deals")[0][0]
+    paged = {"id": "101", "properties": {
+        "dealname": "Big renewal", "dealstage": "closed-won", "amount": "12500.00",
+        "closedate": "1710460800000", "hubspot_owner_id": None,
+    }}
+
+    from_export = sync._transform_deal(exported, "now")
+    from_api = sync._transform_deal(paged, "now")
+    for field in ("deal_stage", "deal_value", "close_date", "is_closed", "is_closed_won"):
+        assert from_export[field] == from_api[field], field
+    assert from_export["close_date"] is not None
+    assert from_export["is_closed_won"] is True
@@ -0,0 +1,72 @@
+"""Incremental (CRM search) listings against a stubbed HubSpot search endpoint."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+# Three records share each modified time, so restarts land in the middle of a group
+RECORDS = [{"id": str(100 + i), "modified": 1_700_000_000_000 + (i // 3) * 1000} for i in range(40)]
+
+
+def _iso(millis):
+    return datetime.fromtimestamp(millis / 1000, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _make_sync(hubspot_sync, monkeypatch, fail=False):
+    monkeypatch.setattr(hubspot_sync, "HUBSPOT_SEARCH_PAGE_SIZE", 4)
+    monkeypatch.setattr(hubspot_sync, "HUBSPOT_SEARCH_MAX_RESULTS", 10)
+    sync = hubspot_sync.HubSpotToSupabaseSync(dedupe="off")
+    sync.searches = []
+
+    async def fake_request(endpoint, params=None, method="GET", json_body=None):
+        assert endpoint.endswith("/search")
+        if fail:
+            return None  # what _make_hubspot_request returns once its 429 retries run out
+        since = int(json_body["filterGroups"][0]["filters"][0]["value"])
+        after = int(json_body.get("after", 0))
+        sync.searches.append((since, after))
+        if after + json_body["limit"] > hubspot_sync.HUBSPOT_SEARCH_MAX_RESULTS:
+            raise AssertionError("paged past the search cap")
+        matching = [record for record in RECORDS if record["modified"] >= since]
+        page = matching[after:after + json_body["limit"]]
+        paging = {"next": {"after": str(after + len(page))}} if after + len(page) < len(matching) else {}
+        return {
+            "results": [
+                {"id": record["id"], "properties": {"hs_lastmodifieddate": _iso(record["modified"])}}
+                for record in page
+            ],
+            "paging": paging,
+        }
+
+    monkeypatch.setattr(sync, "_make_hubspot_request", fake_request)
+    return sync
+
+
+def test_search_restarts_from_last_modified_time_at_the_cap(hubspot_sync, monkeypatch):
+    sync = _make_sync(hubspot_sync, monkeypatch)
+    since = {"property": "hs_lastmodifieddate", "timestamp": datetime.fromtimestamp(1_699_999_999, tz=timezone.utc)}
+
+    async def collect():
+        return [record["id"] async for page in sync._iter_hubspot_pages(
+            "/crm/v3/objects/companies", ["name"], modified_since=since
+        ) for record in page]
+
+    ids = asyncio.run(collect())
+
+    assert ids == [record["id"] for record in RECORDS]
+    assert len({search[0] for search in sync.searches}) > 1
+
+
+def test_failed_incremental_listing_holds_the_daemon_window(hubspot_sync, monkeypatch):
+    sync = _make_sync(hubspot_sync, monkeypatch, fail=True)
+
+    with pytest.raises(Exception, match="stopped early"):
+        asyncio.run(sync._sync_object("companies", 0, datetime.now() - timedelta(hours=1)))
+
+    daemon = hubspot_sync.SyncDaemon(sync, lookback_minutes=60)
+    window = daemon.modified_since
+    asyncio.run(daemon.run_once())
+
+    assert daemon.last_run["failed"] is True
+    assert daemon.modified_since == window
@@ -0,0 +1,59 @@
+"""Link phases against stubbed HubSpot associations and a stubbed Supabase table API."""
+
+import asyncio
+
+
+class Table:
+    """Just enough of supabase-py's query builder for the link phases."""
+
+    def __init__(self, rows, updates):
+        self.rows, self.updates = rows, updates
+        self.body = self.ids = self.row_id = None
+
+    def select(self, columns):
+        return self
+
+    def in_(self, column, ids):
+        self.ids = ids
+        return self
+
+    def update(self, body):
+        self.body = body
+        return self
+
+    def eq(self, column, value):
+        self.row_id = value
+        return self
+
+    def execute(self):
+        if self.body is not None:
+            self.updates.append((self.row_id, self.body))
+            self.rows[self.row_id] = self.body["company_id"]
+            return type("Result", (), {"data": []})()
+        return type("Result", (), {"data": [
+            {"id": row_id, "company_id": self.rows[row_id]} for row_id in self.ids if row_id in self.rows
+        ]})()
+
+
+def test_moving_a_contact_refreshes_both_companies(hubspot_sync, monkeypatch):
+    sync = hubspot_sync.HubSpotToSupabaseSync(dedupe="off")
+    sync.hubspot_to_supabase_ids["companies"].update({501: "company-a", 502: "company-b"})
+    sync.hubspot_to_supabase_ids["contacts"].update({11: "contact-1", 12: "contact-2"})
+    # contact-1 moves from company-a to company-b; contact-2 joins company-b
+    contacts, updates = {"contact-1": "company-a", "contact-2": None}, []
+    sync.supabase = type("Client", (), {"table": lambda self, name: Table(contacts, updates)})()
+    associations = {"11": 502, "12": 502}
+
+    async def fake_associations(url):
+        contact_id = url.split("/")[-3]
+        return {"results": [{"toObjectId": associations[contact_id]}]}
+
+    refreshed = []
+    monkeypatch.setattr(sync, "_get_associations", fake_associations)
+    monkeypatch.setattr(sync, "_refresh_company_stats", lambda company_ids: refreshed.extend(company_ids))
+
+    linked = asyncio.run(sync.link_contacts_to_companies({11, 12}))
+
+    assert linked == 2
+    assert contacts == {"contact-1": "company-b", "contact-2": "company-b"}
+    assert sorted(refreshed) == ["company-a", "company-b"]
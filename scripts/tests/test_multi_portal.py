@@ -0,0 +1,31 @@
+"""MultiPortalRunner (--portals) config checks: portals must not write over each other."""
+
+import pytest
+
+PORTALS = [
+    {"name": "eu", "schema": "hubspot_eu", "api_key": "eu-key"},
+    {"name": "us", "schema": "hubspot_us", "api_key": "us-key"},
+]
+
+
+@pytest.mark.parametrize("portals, dedupe, message", [
+    (PORTALS, "merge", "--dedupe off"),
+    ([PORTALS[0], {"name": "us", "api_key": "us-key"}], "off", "no \"schema\""),
+    ([PORTALS[0], {**PORTALS[1], "schema": "hubspot_eu"}], "off", "must not share"),
+    ([PORTALS[0], {**PORTALS[1], "schema": "public; drop"}], "off", "Invalid schema"),
+])
+def test_portals_that_would_overwrite_each_other_are_refused(hubspot_sync, portals, dedupe, message):
+    with pytest.raises(ValueError, match=message):
+        hubspot_sync.MultiPortalRunner(portals, dedupe=dedupe)
+
+
+def test_each_portal_writes_to_its_own_schema(hubspot_sync, monkeypatch):
+    clients = []
+    monkeypatch.setattr(hubspot_sync, "create_client", lambda url, key, options=None: clients.append(options.schema))
+
+    runner = hubspot_sync.MultiPortalRunner(PORTALS, dedupe="off")
+
+    assert clients == ["hubspot_eu", "hubspot_us"]
+    for name, schema in (("eu", "hubspot_eu"), ("us", "hubspot_us")):
+        headers = runner.syncs[name].rest_headers
+        assert headers["Accept-Profile"] == headers["Content-Profile"] == schema
@@ -0,0 +1,119 @@
+"""PostgresCopyWriter (--writer postgres) against a real database; set SUPABASE_DB_URL to run."""
+
+import os
+import uuid
+
+import pytest
+
+DB_URL = os.getenv("SUPABASE_DB_URL")
+
+pytestmark = pytest.mark.skipif(not DB_URL, reason="SUPABASE_DB_URL is not set")
+
+
+@pytest.fixture
+def contacts_table():
+    psycopg = pytest.importorskip("psycopg")
+    table = f"hubspot_sync_test_contacts_{uuid.uuid4().hex[:8]}"
+    with psycopg.connect(DB_URL, autocommit=True) as conn:
+        conn.execute(
+            f"CREATE TABLE {table} ("
+            " id BIGSERIAL PRIMARY KEY,"
+            " hubspot_contact_id TEXT UNIQUE NOT NULL,"
+            " email TEXT,"
+            " hubspot_raw_data JSONB,"
+            " company_id BIGINT)"
+        )
+        conn.execute(f"INSERT INTO {table} (hubspot_contact_id, email, company_id) VALUES ('1', 'before@acme.test', 77)")
+    try:
+        yield table
+    finally:
+        with psycopg.connect(DB_URL, autocommit=True) as conn:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+def test_stage_and_flush_merges_pages(hubspot_sync, contacts_table):
+    import psycopg
+
+    writer = hubspot_sync.PostgresCopyWriter(DB_URL, stage_suffix="_test")
+    try:
+        writer.stage(contacts_table, [
+            {"hubspot_contact_id": "1", "email": "first@acme.test", "hubspot_raw_data": {"page": 1}, "company_id": None},
+            {"hubspot_contact_id": "2", "email": "b@acme.test", "hubspot_raw_data": {"page": 1}, "company_id": None},
+        ])
+        writer.stage(contacts_table, [
+            {"hubspot_contact_id": "1", "email": "latest@acme.test", "hubspot_raw_data": {"page": 2}, "company_id": None},
+        ])
+        merged = writer.flush(contacts_table, "hubspot_contact_id", ("company_id",))
+
+        assert sorted(row["hubspot_contact_id"] for row in merged) == ["1", "2"]
+        assert {row["hubspot_contact_id"]: row["company_id"] for row in merged} == {"1": 77, "2": None}
+
+        with psycopg.connect(DB_URL) as conn:
+            rows = conn.execute(
+                f"SELECT hubspot_contact_id, email, hubspot_raw_data, company_id FROM {contacts_table} ORDER BY hubspot_contact_id"
+            ).fetchall()
+            staged = conn.execute(f"SELECT COUNT(*) FROM {writer._stage_table(contacts_table)}").fetchone()[0]
+
+        # The later page wins the duplicate key, and the existing company link survives the upsert
+        assert rows == [
+            ("1", "latest@acme.test", {"page": 2}, 77),
+            ("2", "b@acme.test", {"page": 1}, None),
+        ]
+        assert staged == 0
+    finally:
+        writer.close()
+
+
+def test_failed_statements_leave_the_connection_usable(hubspot_sync, contacts_table):
+    import psycopg
+
+    writer = hubspot_sync.PostgresCopyWriter(DB_URL, stage_suffix="_test")
+    writer.RETRY_CHUNK_ROWS = 1
+    try:
+        writer.stage(contacts_table, [
+            {"hubspot_contact_id": "1", "email": "a@acme.test", "hubspot_raw_data": {}, "company_id": None},
+        ])
+        # A page that can't be copied is lost on its own
+        with pytest.raises(psycopg.Error):
+            writer.stage(contacts_table, [
+                {"hubspot_contact_id": "2", "email": "b@acme.test", "hubspot_raw_data": {}, "company_id": "not a number"},
+            ])
+        # A row the target table rejects only fails its own chunk of the merge
+        writer.stage(contacts_table, [
+            {"hubspot_contact_id": "3", "email": "c@acme.test", "hubspot_raw_data": {}, "company_id": None},
+            {"hubspot_contact_id": None, "email": "broken@acme.test", "hubspot_raw_data": {}, "company_id": None},
+            {"hubspot_contact_id": "4", "email": "d@acme.test", "hubspot_raw_data": {}, "company_id": None},
+        ])
+        merged = writer.flush(contacts_table, "hubspot_contact_id")
+
+        assert sorted(row["hubspot_contact_id"] for row in merged) == ["1", "3", "4"]
+        errors = writer.drain_errors()
+        assert len(errors) == 1 and "failed" in errors[0]
+        assert writer.drain_errors() == []
+
+        # The stage was emptied and the next page goes through normally
+        writer.stage(contacts_table, [
+            {"hubspot_contact_id": "5", "email": "e@acme.test", "hubspot_raw_data": {}, "company_id": None},
+        ])
+        assert [row["hubspot_contact_id"] for row in writer.flush(contacts_table, "hubspot_contact_id")] == ["5"]
+    finally:
+        writer.close()
+
+
+def test_schema_keeps_a_portal_in_its_own_tables(hubspot_sync):
+    import psycopg
+
+    schema = f"hubspot_sync_test_{uuid.uuid4().hex[:8]}"
+    with psycopg.connect(DB_URL, autocommit=True) as conn:
+        conn.execute(f"CREATE SCHEMA {schema}")
+        conn.execute(f"CREATE TABLE {schema}.deals (id BIGSERIAL PRIMARY KEY, hubspot_deal_id TEXT UNIQUE NOT NULL, dealname TEXT)")
+    writer = hubspot_sync.PostgresCopyWriter(DB_URL, stage_suffix="_test", schema=schema)
+    try:
+        writer.stage("deals", [{"hubspot_deal_id": "7", "dealname": "Renewal"}])
+        assert [row["hubspot_deal_id"] for row in writer.flush("deals", "hubspot_deal_id")] == ["7"]
+        with psycopg.connect(DB_URL) as conn:
+            assert conn.execute(f"SELECT hubspot_deal_id, dealname FROM {schema}.deals").fetchall() == [("7", "Renewal")]
+    finally:
+        writer.close()
+        with psycopg.connect(DB_URL, autocommit=True) as conn:
+            conn.execute(f"DROP SCHEMA {schema} CASCADE")
@@ -0,0 +1,109 @@
+"""reconcile (--reconcile) against stubbed HubSpot listings and Supabase ID streams."""
+
+import asyncio
+
+import pytest
+
+LIVE = {"companies": [1, 2, 3, 4, 5, 6, 7, 8, 9, 10], "contacts": [21, 22], "deals": [31]}
+ACTIVE = {"companies": [1, 2, 3, 4, 5, 6, 7, 8, 9, 10], "contacts": [21, 22], "deals": [31]}
+
+
+class Rpc:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def rpc(self, name, params=None):
+        self.calls.append(("rpc", name))
+        return self
+
+    def execute(self):
+        return type("Result", (), {"data": 0})()
+
+
+def _make_sync(hubspot_sync, monkeypatch, live=None, active=None, soft_deleted=None, fail_page=None):
+    live = {**LIVE, **(live or {})}
+    active = {**ACTIVE, **(active or {})}
+    soft_deleted = soft_deleted or {}
+    sync = hubspot_sync.HubSpotToSupabaseSync(dedupe="off")
+    sync.events = []
+    endpoints = {spec["endpoint"]: object_type for object_type, spec in hubspot_sync.SYNC_OBJECTS.items()}
+
+    async def fake_request(endpoint, params=None, method="GET", json_body=None):
+        object_type = endpoints[endpoint]
+        archived = params["archived"] == "true"
+        sync.events.append(("hubspot", object_type, archived))
+        ids = [] if archived else live[object_type]
+        page = int(params.get("after", 0))
+        if fail_page is not None and not archived and page == fail_page:
+            return None  # what _make_hubspot_request returns once its 429 retries run out
+        chunk = ids[page * 4:(page + 1) * 4]
+        paging = {"next": {"after": str(page + 1)}} if (page + 1) * 4 < len(ids) else {}
+        return {"results": [{"id": str(i)} for i in chunk], "paging": paging}
+
+    def fake_supabase_ids(object_type, page_size=1000):
+        sync.events.append(("supabase", object_type))
+        return (
+            hubspot_sync._sorted_id_array(active[object_type]),
+            hubspot_sync._sorted_id_array(soft_deleted.get(object_type, [])),
+        )
+
+    def fake_bulk_update(object_type, hubspot_ids, body):
+        sync.events.append(("write", object_type, list(hubspot_ids), body))
+        return len(hubspot_ids)
+
+    monkeypatch.setattr(sync, "_make_hubspot_request", fake_request)
+    monkeypatch.setattr(sync, "_stream_supabase_ids", fake_supabase_ids)
+    monkeypatch.setattr(sync, "_bulk_update_by_hubspot_id", fake_bulk_update)
+    sync.supabase = Rpc(sync.events)
+    return sync
+
+
+def _writes(sync):
+    return [event for event in sync.events if event[0] in ("write", "rpc")]
+
+
+def test_partial_listing_raises_without_writing(hubspot_sync, monkeypatch):
+    sync = _make_sync(hubspot_sync, monkeypatch, fail_page=1)
+
+    with pytest.raises(Exception, match="stopped early"):
+        asyncio.run(sync.reconcile("purge"))
+    assert _writes(sync) == []
+
+
+def test_supabase_ids_are_listed_before_hubspot(hubspot_sync, monkeypatch):
+    sync = _make_sync(hubspot_sync, monkeypatch)
+    asyncio.run(sync.reconcile())
+
+    companies = [event[0] for event in sync.events if event[1] == "companies"]
+    assert companies[0] == "supabase"
+
+
+def test_stale_fraction_guard(hubspot_sync, monkeypatch):
+    sync = _make_sync(hubspot_sync, monkeypatch, live={"companies": [1, 2, 3, 4, 5]})
+
+    with pytest.raises(Exception, match="Refusing to soft-delete"):
+        asyncio.run(sync.reconcile())
+    assert _writes(sync) == []
+
+    sync.events.clear()
+    report = asyncio.run(sync.reconcile(force=True))
+    stale_writes = [event for event in _writes(sync) if event[0] == "write" and event[1] == "companies"]
+    assert [event[2] for event in stale_writes] == [[6, 7, 8, 9, 10]]
+    assert stale_writes[0][3]["hubspot_archived_at"]
+    assert report["companies"]["soft_deleted"] == 5
+
+
+def test_rows_live_again_are_restored(hubspot_sync, monkeypatch):
+    sync = _make_sync(
+        hubspot_sync, monkeypatch,
+        live={"contacts": [21, 22, 23]},
+        soft_deleted={"contacts": [23, 24]},
+    )
+
+    report = asyncio.run(sync.reconcile())
+
+    assert ("write", "contacts", [23], {"hubspot_archived_at": None}) in sync.events
+    assert report["contacts"]["restored"] == 1
+    assert report["contacts"]["stale"] == 0
+    # The dashboard aggregates are rebuilt once after the changes
+    assert sync.events[-1] == ("rpc", "refresh_all_company_stats")
@@ -0,0 +1,121 @@
+"""WriterPool retries, byte budget and writer autotuning, and _sync_object's use of it."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def no_backoff(hubspot_sync, monkeypatch):
+    sleep = asyncio.sleep
+    monkeypatch.setattr(hubspot_sync.asyncio, "sleep", lambda delay: sleep(0))
+
+
+def _run_pool(pool, *submissions):
+    async def run():
+        for args in submissions:
+            await pool.submit("companies", *args)
+        return await pool.drain("companies")
+    return asyncio.run(run())
+
+
+def test_transient_failures_are_retried(hubspot_sync, no_backoff):
+    pool = hubspot_sync.WriterPool(retries=3, autotune=False)
+    attempts, done = [], []
+
+    def write():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise hubspot_sync.TransientWriteError("503")
+        return ["row"]
+
+    errors = _run_pool(pool, (write, 10, done.append))
+
+    assert errors == [] and done == [["row"]]
+    assert len(attempts) == 3 and pool.retried == 2
+
+
+def test_exhausted_and_permanent_failures_call_on_failed(hubspot_sync, no_backoff):
+    pool = hubspot_sync.WriterPool(retries=1, autotune=False)
+    failed = []
+
+    def transient():
+        raise hubspot_sync.TransientWriteError("503")
+
+    def permanent():
+        raise ValueError("bad row")
+
+    errors = _run_pool(
+        pool,
+        (transient, 10, pytest.fail, lambda: failed.append("transient")),
+        (permanent, 10, pytest.fail, lambda: failed.append("permanent")),
+    )
+
+    assert sorted(failed) == ["permanent", "transient"]
+    assert len(errors) == 2
+    # Only the transient failure was retried
+    assert pool.retried == 1
+    assert pool.in_flight["companies"] == 0 and pool.in_flight_bytes == 0
+
+
+def test_byte_budget_holds_back_submissions(hubspot_sync):
+    pool = hubspot_sync.WriterPool(max_writers=4, max_in_flight_bytes=10, autotune=False)
+    release = threading.Event()
+    order = []
+
+    def slow_write():
+        release.wait(5)
+        order.append("first done")
+        return []
+
+    async def run():
+        await pool.submit("companies", slow_write, 8, lambda result: None)
+        second = asyncio.ensure_future(pool.submit("companies", lambda: [], 8, lambda result: None))
+        await asyncio.sleep(0.05)
+        order.append("second waiting" if not second.done() else "second started")
+        release.set()
+        await second
+        await pool.drain("companies")
+
+    asyncio.run(run())
+    assert order == ["second waiting", "first done"]
+    assert pool.peak["companies"] == 1
+
+
+def test_autotune_grows_while_busy_and_backs_off_when_slow(hubspot_sync):
+    pool = hubspot_sync.WriterPool(max_writers=8, autotune=True, latency_tolerance=2.0)
+    pool.limits["companies"] = 1
+    pool.in_flight["companies"] = 1
+
+    for _ in range(3):
+        pool._observe("companies", 0.1)
+    assert pool.limits["companies"] == 2
+
+    pool.limits["companies"] = 8
+    for _ in range(10):
+        pool._observe("companies", 1.0)
+    assert pool.limits["companies"] < 8
+
+
+def test_sync_object_drains_writes_when_the_page_loop_fails(hubspot_sync, monkeypatch):
+    sync = hubspot_sync.HubSpotToSupabaseSync(dedupe="off")
+
+    async def pages(*args, **kwargs):
+        yield [{"id": "1", "properties": {"name": "Acme", "domain": "acme.test"}}]
+        raise RuntimeError("HubSpot went away")
+
+    def slow_insert(object_type, rows, body=None):
+        time.sleep(0.05)
+        return [{"id": "row-1", "hubspot_company_id": "1"}]
+
+    monkeypatch.setattr(sync, "_iter_hubspot_pages", pages)
+    monkeypatch.setattr(sync, "_insert_rows", slow_insert)
+
+    with pytest.raises(RuntimeError, match="went away"):
+        asyncio.run(sync._sync_object("companies"))
+
+    assert not sync.writer_pool.tasks["companies"]
+    assert sync.writer_pool.in_flight_bytes == 0
+    assert sync.stats.companies == 1
@@ -11,8 +11,8 @@ export async function GET(request: NextRequest) {
 
     const supabase = await createClient()
 
-    // Get basic companies first
-    const { data: basicCompanies, error: basicError } = await supabase
+    // Companies with their precomputed aggregates (company_stats is kept current by the HubSpot sync)
+    const { data: companies, error: companiesError } = await supabase
       .from('companies')
       .select(`
         id,
@@ -21,42 +21,31 @@ export async function GET(request: NextRequest) {
         industry,
         city,
         state,
-        hubspot_company_id
+        hubspot_company_id,
+        company_stats (
+          contact_count,
+          deal_count,
+          total_deal_value
+        )
       `)
       .order('name')
 
-    if (basicError) {
-      console.error('Error fetching basic companies:', basicError)
+    if (companiesError) {
+      console.error('Error fetching companies:', companiesError)
       return NextResponse.json({ error: 'Failed to fetch companies' }, { status: 500 })
     }
 
-    // For each company, get counts separately
-    const companiesWithStats = await Promise.all(
-      (basicCompanies || []).map(async (company) => {
-        const [contactsResult, dealsResult] = await Promise.all([
-          supabase
-            .from('contacts')
-            .select('id', { count: 'exact', head: true })
-            .eq('company_id', company.id),
-          supabase
-            .from('deals')
-            .select('deal_value')
-            .eq('company_id', company.id)
-        ])
-
-        const contactCount = contactsResult.count || 0
-        const dealCount = dealsResult.data?.length || 0
-        const totalDealValue = dealsResult.data?.reduce((sum, deal) => 
-          sum + (deal.deal_value || 0), 0) || 0
-
-        return {
-          ...company,
-          contact_count: contactCount,
-          deal_count: dealCount,
-          total_deal_value: totalDealValue
-        }
-      })
-    )
+    const companiesWithStats = (companies || []).map(({ company_stats, ...company }) => {
+      // One-to-one embed; older PostgREST versions return it as a single-element array
+      const stats = Array.isArray(company_stats) ? company_stats[0] : company_stats
+
+      return {
+        ...company,
+        contact_count: Number(stats?.contact_count || 0),
+        deal_count: Number(stats?.deal_count || 0),
+        total_deal_value: Number(stats?.total_deal_value || 0)
+      }
+    })
 
     return NextResponse.json({ companies: companiesWithStats })
   } catch (error) {
@@ -1,68 +1,8 @@
--- Create an efficient RPC function to get embedding queue stats
--- Run this in your Supabase SQL Editor
-
-CREATE OR REPLACE FUNCTION get_embedding_queue_stats()
-RETURNS JSON AS $$
-DECLARE
-  result JSON;
-BEGIN
-  SELECT json_build_object(
-    'pending', COALESCE(SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END), 0),
-    'processing', COALESCE(SUM(CASE WHEN status = 'processing' THEN 1 ELSE 0 END), 0),
-    'completed', COALESCE(SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END), 0),
-    'failed', COALESCE(SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END), 0)
-  ) INTO result
-  FROM embedding_queue;
-  
-  RETURN result;
-END;
-$$ LANGUAGE plpgsql;
-
--- Create an index on status column for faster queries (if it doesn't exist)
-CREATE INDEX IF NOT EXISTS idx_embedding_queue_status ON embedding_queue(status);
-
--- Also create a faster pure SQL version
-CREATE OR REPLACE FUNCTION get_embedding_queue_stats_fast()
-RETURNS TABLE(
-  pending BIGINT,
-  processing BIGINT,
-  completed BIGINT,
-  failed BIGINT
-) AS $$
-BEGIN
-  RETURN QUERY
-  SELECT 
-    COALESCE(SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END), 0) as pending,
-    COALESCE(SUM(CASE WHEN status = 'processing' THEN 1 ELSE 0 END), 0) as processing,
-    COALESCE(SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END), 0) as completed,
-    COALESCE(SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END), 0) as failed
-  FROM embedding_queue;
-END;
-$$ LANGUAGE plpgsql;
-
--- Missing RPC function for fast embedding queue statistics
--- This fixes the "RPC function not available, falling back to manual count" issue
-
-CREATE OR REPLACE FUNCTION get_embedding_queue_stats_fast()
-RETURNS TABLE (
-  pending BIGINT,
-  processing BIGINT,
-  completed BIGINT,
-  failed BIGINT
-) 
-LANGUAGE SQL
-SECURITY DEFINER
-AS $$
-  SELECT 
-    COUNT(*) FILTER (WHERE status = 'pending') as pending,
-    COUNT(*) FILTER (WHERE status = 'processing') as processing,
-    COUNT(*) FILTER (WHERE status = 'completed') as completed,
-    COUNT(*) FILTER (WHERE status = 'failed') as failed
-  FROM embedding_queue;
-$$;
-
--- Grant access to the function
-GRANT EXECUTE ON FUNCTION get_embedding_queue_stats_fast() TO anon, authenticated;
+-- Embedding queue table, indexes and RLS policy
+-- Run this in your Supabase SQL Editor, before or after applying
+-- supabase/migrations/20261019_embedding_queue_counters.sql (which also creates the
+-- table). The stats RPCs (get_embedding_queue_stats, get_embedding_queue_stats_fast)
+-- are defined there and read trigger-maintained counters instead of scanning the queue.
 
 -- Additional embedding queue table (if it doesn't exist)
 CREATE TABLE IF NOT EXISTS public.embedding_queue (
@@ -0,0 +1,192 @@
+-- Embedding Queue Counters Migration
+-- Keeps per-status row counts for embedding_queue in a small counters table so the
+-- stats RPC no longer scans the queue. Counts are maintained by statement-level
+-- triggers (one upsert per status per statement, however many rows it touched) and
+-- spread over a few slots per status so concurrent workers don't queue on one row.
+-- reconcile_embedding_queue_counters() corrects any drift; run it periodically
+-- (pg_cron below, or `python scripts/embedding_queue_stats.py reconcile`).
+
+-- The queue itself, for projects that never ran supabase-sql-function.sql (same
+-- definition, so that file can still be run before or after this migration).
+-- RLS without policies keeps it to the service role until that file adds its policy.
+CREATE TABLE IF NOT EXISTS public.embedding_queue (
+  id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+  item_type TEXT NOT NULL CHECK (item_type IN ('email', 'calendar_event')),
+  item_id TEXT NOT NULL,
+  embedding_text TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'processing', 'completed', 'failed')),
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  processed_at TIMESTAMP WITH TIME ZONE,
+  error_message TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_embedding_queue_status ON public.embedding_queue(status);
+
+ALTER TABLE public.embedding_queue ENABLE ROW LEVEL SECURITY;
+
+CREATE TABLE IF NOT EXISTS public.embedding_queue_counters (
+  status TEXT NOT NULL,
+  slot SMALLINT NOT NULL,
+  count BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (status, slot)
+);
+
+COMMENT ON TABLE public.embedding_queue_counters IS 'Row counts of embedding_queue per status, maintained by triggers; sum over slot for the total';
+
+ALTER TABLE public.embedding_queue_counters ENABLE ROW LEVEL SECURITY;
+
+-- Apply the net per-status change of one statement
+CREATE OR REPLACE FUNCTION embedding_queue_counters_apply()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+  v_slot SMALLINT := pg_backend_pid() % 8;
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO public.embedding_queue_counters AS c (status, slot, count)
+    SELECT status, v_slot, COUNT(*) FROM new_rows GROUP BY status
+    ON CONFLICT (status, slot) DO UPDATE SET count = c.count + EXCLUDED.count;
+  ELSIF TG_OP = 'DELETE' THEN
+    INSERT INTO public.embedding_queue_counters AS c (status, slot, count)
+    SELECT status, v_slot, -COUNT(*) FROM old_rows GROUP BY status
+    ON CONFLICT (status, slot) DO UPDATE SET count = c.count + EXCLUDED.count;
+  ELSE
+    INSERT INTO public.embedding_queue_counters AS c (status, slot, count)
+    SELECT status, v_slot, SUM(delta)
+    FROM (
+      SELECT status, 1 AS delta FROM new_rows
+      UNION ALL
+      SELECT status, -1 AS delta FROM old_rows
+    ) changes
+    GROUP BY status
+    HAVING SUM(delta) <> 0
+    ON CONFLICT (status, slot) DO UPDATE SET count = c.count + EXCLUDED.count;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION embedding_queue_counters_truncate()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+  DELETE FROM public.embedding_queue_counters;
+  RETURN NULL;
+END;
+$$;
+
+-- Transition tables need one trigger per event
+DROP TRIGGER IF EXISTS embedding_queue_counters_insert ON public.embedding_queue;
+CREATE TRIGGER embedding_queue_counters_insert
+  AFTER INSERT ON public.embedding_queue
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION embedding_queue_counters_apply();
+
+DROP TRIGGER IF EXISTS embedding_queue_counters_update ON public.embedding_queue;
+CREATE TRIGGER embedding_queue_counters_update
+  AFTER UPDATE ON public.embedding_queue
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION embedding_queue_counters_apply();
+
+DROP TRIGGER IF EXISTS embedding_queue_counters_delete ON public.embedding_queue;
+CREATE TRIGGER embedding_queue_counters_delete
+  AFTER DELETE ON public.embedding_queue
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION embedding_queue_counters_apply();
+
+DROP TRIGGER IF EXISTS embedding_queue_counters_truncate ON public.embedding_queue;
+CREATE TRIGGER embedding_queue_counters_truncate
+  AFTER TRUNCATE ON public.embedding_queue
+  FOR EACH STATEMENT EXECUTE FUNCTION embedding_queue_counters_truncate();
+
+-- Same signature as before, so EmbeddingService.getQueueStats keeps working; reads
+-- at most statuses x slots rows instead of the whole queue
+CREATE OR REPLACE FUNCTION get_embedding_queue_stats_fast()
+RETURNS TABLE (
+  pending BIGINT,
+  processing BIGINT,
+  completed BIGINT,
+  failed BIGINT
+)
+LANGUAGE SQL
+STABLE
+SECURITY DEFINER
+AS $$
+  SELECT
+    COALESCE(SUM(count) FILTER (WHERE status = 'pending'), 0)::BIGINT as pending,
+    COALESCE(SUM(count) FILTER (WHERE status = 'processing'), 0)::BIGINT as processing,
+    COALESCE(SUM(count) FILTER (WHERE status = 'completed'), 0)::BIGINT as completed,
+    COALESCE(SUM(count) FILTER (WHERE status = 'failed'), 0)::BIGINT as failed
+  FROM public.embedding_queue_counters;
+$$;
+
+CREATE OR REPLACE FUNCTION get_embedding_queue_stats()
+RETURNS JSON
+LANGUAGE SQL
+STABLE
+SECURITY DEFINER
+AS $$
+  SELECT row_to_json(s) FROM get_embedding_queue_stats_fast() s;
+$$;
+
+GRANT EXECUTE ON FUNCTION get_embedding_queue_stats_fast() TO anon, authenticated;
+
+-- Recount the queue and fold any difference back into the counters. The count and
+-- the counter sums are read in one statement (one snapshot), and the correction is
+-- applied as a delta, so writes running concurrently are neither lost nor counted twice.
+-- Returns the per-status drift that was corrected.
+CREATE OR REPLACE FUNCTION reconcile_embedding_queue_counters()
+RETURNS TABLE (
+  status TEXT,
+  counted BIGINT,
+  tracked BIGINT,
+  drift BIGINT
+)
+LANGUAGE SQL
+SECURITY DEFINER
+AS $$
+  WITH actual AS (
+    SELECT q.status, COUNT(*) AS n FROM public.embedding_queue q GROUP BY q.status
+  ), tracked AS (
+    SELECT c.status, SUM(c.count) AS n FROM public.embedding_queue_counters c GROUP BY c.status
+  ), diff AS (
+    SELECT
+      COALESCE(a.status, t.status) AS status,
+      COALESCE(a.n, 0)::BIGINT AS counted,
+      COALESCE(t.n, 0)::BIGINT AS tracked,
+      (COALESCE(a.n, 0) - COALESCE(t.n, 0))::BIGINT AS drift
+    FROM actual a
+    FULL OUTER JOIN tracked t ON t.status = a.status
+  ), fixed AS (
+    INSERT INTO public.embedding_queue_counters AS c (status, slot, count)
+    SELECT d.status, 0, d.drift FROM diff d WHERE d.drift <> 0
+    ON CONFLICT (status, slot) DO UPDATE SET count = c.count + EXCLUDED.count
+  )
+  SELECT d.status, d.counted, d.tracked, d.drift FROM diff d ORDER BY d.status;
+$$;
+
+-- Runs as the owner and scans the whole queue; only the service role may call it
+REVOKE EXECUTE ON FUNCTION reconcile_embedding_queue_counters() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION reconcile_embedding_queue_counters() TO service_role;
+
+-- Seed the counters from the current contents. CREATE TRIGGER waits out in-flight
+-- writers, so everything from here on is either counted now or by the triggers.
+SELECT * FROM reconcile_embedding_queue_counters();
+
+-- Reconcile every 15 minutes where pg_cron is available
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    PERFORM cron.schedule(
+      'reconcile-embedding-queue-counters',
+      '*/15 * * * *',
+      'SELECT reconcile_embedding_queue_counters()'
+    );
+  END IF;
+END;
+$$;
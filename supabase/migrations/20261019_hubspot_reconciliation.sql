@@ -0,0 +1,16 @@
+-- HubSpot Reconciliation Migration
+-- Soft-delete marker for rows whose HubSpot record was archived, merged or deleted.
+-- Set and cleared by `hubspot_sync.py --reconcile soft-delete`.
+
+ALTER TABLE companies ADD COLUMN IF NOT EXISTS hubspot_archived_at TIMESTAMPTZ;
+ALTER TABLE contacts ADD COLUMN IF NOT EXISTS hubspot_archived_at TIMESTAMPTZ;
+ALTER TABLE deals ADD COLUMN IF NOT EXISTS hubspot_archived_at TIMESTAMPTZ;
+
+-- Partial indexes so "live rows only" filters stay cheap
+CREATE INDEX IF NOT EXISTS idx_companies_hubspot_live ON companies(hubspot_company_id) WHERE hubspot_archived_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_contacts_hubspot_live ON contacts(hubspot_contact_id) WHERE hubspot_archived_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_deals_hubspot_live ON deals(hubspot_deal_id) WHERE hubspot_archived_at IS NULL;
+
+COMMENT ON COLUMN companies.hubspot_archived_at IS 'When the HubSpot company was found archived/merged; NULL while it is live in HubSpot';
+COMMENT ON COLUMN contacts.hubspot_archived_at IS 'When the HubSpot contact was found archived/merged; NULL while it is live in HubSpot';
+COMMENT ON COLUMN deals.hubspot_archived_at IS 'When the HubSpot deal was found archived/merged; NULL while it is live in HubSpot';
@@ -0,0 +1,172 @@
+-- Company Stats Migration
+-- Per-company dashboard aggregates (contact/deal counts, pipeline, closed-won), kept
+-- in company_stats so dashboards read one row per company instead of scanning
+-- contacts and deals. hubspot_sync.py refreshes the companies touched by each
+-- written batch through refresh_company_stats(); refresh_all_company_stats()
+-- rebuilds everything (backfill, after reconciliation, nightly via pg_cron).
+-- Archived rows (hubspot_archived_at set) are not counted.
+
+-- Same company_id type as companies.id, whatever this project uses
+CREATE TABLE IF NOT EXISTS company_stats AS
+SELECT
+  id AS company_id,
+  0::BIGINT AS contact_count,
+  0::BIGINT AS deal_count,
+  0::BIGINT AS open_deal_count,
+  0::NUMERIC AS pipeline_value,
+  0::NUMERIC AS total_deal_value,
+  0::BIGINT AS won_deal_count,
+  0::NUMERIC AS won_deal_value,
+  NOW() AS refreshed_at
+FROM companies
+WITH NO DATA;
+
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'company_stats_pkey') THEN
+    ALTER TABLE company_stats ADD CONSTRAINT company_stats_pkey PRIMARY KEY (company_id);
+    ALTER TABLE company_stats ADD CONSTRAINT company_stats_company_id_fkey
+      FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE CASCADE;
+  END IF;
+END;
+$$;
+
+ALTER TABLE company_stats ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Authenticated users can view company stats" ON company_stats
+FOR SELECT USING (auth.role() IN ('authenticated', 'service_role'));
+
+-- The refresh aggregates by company, so these must exist
+CREATE INDEX IF NOT EXISTS idx_contacts_company_id ON contacts(company_id);
+CREATE INDEX IF NOT EXISTS idx_deals_company_id ON deals(company_id);
+
+-- Recompute the given companies (a JSON array of companies.id values) in one statement.
+-- Returns the number of companies refreshed; IDs of deleted companies are ignored.
+CREATE OR REPLACE FUNCTION refresh_company_stats(company_ids JSONB)
+RETURNS INTEGER
+LANGUAGE SQL
+SECURITY DEFINER
+AS $$
+  WITH ids AS (
+    -- jsonb_populate_recordset casts the IDs to company_stats.company_id's type
+    SELECT DISTINCT c.id AS company_id
+    FROM jsonb_populate_recordset(
+      NULL::company_stats,
+      (SELECT COALESCE(jsonb_agg(jsonb_build_object('company_id', v)), '[]'::jsonb)
+       FROM jsonb_array_elements(company_ids) v)
+    ) requested
+    JOIN companies c ON c.id = requested.company_id
+  ), contact_totals AS (
+    SELECT ct.company_id, COUNT(*) AS contact_count
+    FROM contacts ct
+    JOIN ids ON ids.company_id = ct.company_id
+    WHERE ct.hubspot_archived_at IS NULL
+    GROUP BY ct.company_id
+  ), deal_totals AS (
+    SELECT
+      d.company_id,
+      COUNT(*) AS deal_count,
+      COUNT(*) FILTER (WHERE NOT COALESCE(d.is_closed, FALSE)) AS open_deal_count,
+      COALESCE(SUM(d.deal_value) FILTER (WHERE NOT COALESCE(d.is_closed, FALSE)), 0) AS pipeline_value,
+      COALESCE(SUM(d.deal_value), 0) AS total_deal_value,
+      COUNT(*) FILTER (WHERE d.is_closed_won) AS won_deal_count,
+      COALESCE(SUM(d.deal_value) FILTER (WHERE d.is_closed_won), 0) AS won_deal_value
+    FROM deals d
+    JOIN ids ON ids.company_id = d.company_id
+    WHERE d.hubspot_archived_at IS NULL
+    GROUP BY d.company_id
+  ), upserted AS (
+    INSERT INTO company_stats (
+      company_id, contact_count, deal_count, open_deal_count, pipeline_value,
+      total_deal_value, won_deal_count, won_deal_value, refreshed_at
+    )
+    SELECT
+      ids.company_id,
+      COALESCE(ct.contact_count, 0),
+      COALESCE(dt.deal_count, 0),
+      COALESCE(dt.open_deal_count, 0),
+      COALESCE(dt.pipeline_value, 0),
+      COALESCE(dt.total_deal_value, 0),
+      COALESCE(dt.won_deal_count, 0),
+      COALESCE(dt.won_deal_value, 0),
+      NOW()
+    FROM ids
+    LEFT JOIN contact_totals ct ON ct.company_id = ids.company_id
+    LEFT JOIN deal_totals dt ON dt.company_id = ids.company_id
+    ON CONFLICT (company_id) DO UPDATE SET
+      contact_count = EXCLUDED.contact_count,
+      deal_count = EXCLUDED.deal_count,
+      open_deal_count = EXCLUDED.open_deal_count,
+      pipeline_value = EXCLUDED.pipeline_value,
+      total_deal_value = EXCLUDED.total_deal_value,
+      won_deal_count = EXCLUDED.won_deal_count,
+      won_deal_value = EXCLUDED.won_deal_value,
+      refreshed_at = EXCLUDED.refreshed_at
+    RETURNING 1
+  )
+  SELECT COUNT(*)::INTEGER FROM upserted;
+$$;
+
+-- Rebuild every company's stats in one pass
+CREATE OR REPLACE FUNCTION refresh_all_company_stats()
+RETURNS INTEGER
+LANGUAGE SQL
+SECURITY DEFINER
+AS $$
+  SELECT refresh_company_stats(COALESCE(jsonb_agg(id), '[]'::jsonb)) FROM companies;
+$$;
+
+-- Both run as the owner and the full rebuild scans every company; only the sync may call them
+REVOKE EXECUTE ON FUNCTION refresh_company_stats(JSONB) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION refresh_all_company_stats() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION refresh_company_stats(JSONB) TO service_role;
+GRANT EXECUTE ON FUNCTION refresh_all_company_stats() TO service_role;
+
+-- Same signature as before; counts now come from company_stats (live rows only)
+CREATE OR REPLACE FUNCTION get_companies_with_stats()
+RETURNS TABLE (
+  id TEXT,
+  name TEXT,
+  domain TEXT,
+  industry TEXT,
+  city TEXT,
+  state TEXT,
+  hubspot_company_id TEXT,
+  contact_count BIGINT,
+  deal_count BIGINT,
+  total_deal_value NUMERIC
+) AS $$
+BEGIN
+  RETURN QUERY
+  SELECT
+    c.id::TEXT,
+    c.name::TEXT,
+    c.domain::TEXT,
+    c.industry::TEXT,
+    c.city::TEXT,
+    c.state::TEXT,
+    c.hubspot_company_id,
+    COALESCE(s.contact_count, 0),
+    COALESCE(s.deal_count, 0),
+    COALESCE(s.total_deal_value, 0)
+  FROM companies c
+  LEFT JOIN company_stats s ON s.company_id = c.id
+  ORDER BY c.name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill
+SELECT refresh_all_company_stats();
+
+-- Rebuild nightly where pg_cron is available, to catch changes made outside the sync
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    PERFORM cron.schedule('refresh-company-stats', '30 3 * * *', 'SELECT refresh_all_company_stats()');
+  END IF;
+END;
+$$;
+
+COMMENT ON TABLE company_stats IS 'Per-company contact/deal aggregates maintained by hubspot_sync.py (see refresh_company_stats)';
+COMMENT ON COLUMN company_stats.pipeline_value IS 'Sum of deal_value over open (not closed) deals';
+COMMENT ON COLUMN company_stats.won_deal_value IS 'Sum of deal_value over closed-won deals';